@@ -1,7 +1,10 @@
 # gui/main_window.py
+import hashlib
+import json
 import os
 import time
 import tempfile
+import numpy as np
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QPushButton, QVBoxLayout,
                              QHBoxLayout, QLabel, QFileDialog, QComboBox,
                              QSpinBox, QPlainTextEdit, QMessageBox, QCheckBox)
@@ -116,6 +119,7 @@ class MainWindow(QMainWindow):
         self.points_for_calc = None  # points (n,2) used for calculation (no degrees)
         self.ids = None
         self.distance_matrix = None
+        self._csv_sha = None
         self.solver_thread = None
         self.solver_worker = None
         self.last_map_update = 0.0
@@ -135,12 +139,17 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Load error", f"Failed to load CSV: {e}")
             return
+        # fingerprint the CSV so the distance matrix can be cached on disk
+        with open(path, 'rb') as f:
+            self._csv_sha = hashlib.sha1(f.read()).hexdigest()
+        self.distance_matrix = None
         self.ids = loader.get_ids(self.df)
         # points for calculation — do NOT divide by 100 (as assignment expects)
         pts_calc = loader.get_points(self.df, convert_to_degrees=False)  # float32 with lat_dd, lon_dd
         self.points_for_calc = pts_calc  # used for distances
-        # points for map (degrees)
-        pts_map = loader.get_points(self.df, convert_to_degrees=True) if self.check_degrees.isChecked() else pts_calc
+        # points for map (degrees): derived from the calc array with one
+        # multiply instead of a second DataFrame extraction
+        pts_map = pts_calc * np.float32(0.01) if self.check_degrees.isChecked() else pts_calc
         self.points = pts_map
         self.log_append(f"Loaded {len(self.df)} rows from {os.path.basename(path)}")
         # precompute matrix lazily? Offer to compute now (or we compute on start)
@@ -150,13 +159,57 @@ class MainWindow(QMainWindow):
         # show initial map
         self.map_widget.show_points(self.points, ids=self.ids)
 
+    CACHE_DIR = '.tsp_cache'
+
     def prepare_distance_matrix(self):
-        # compute D from points_for_calc (n,2)
+        # compute D from points_for_calc (n,2), memoized on disk keyed by
+        # the CSV content hash so re-runs skip the O(n^2) build
+        cached = self._load_cached_matrix()
+        if cached is not None:
+            self.distance_matrix = cached
+            self.log_append("Distance matrix loaded from cache (shape: %d x %d)"
+                            % (cached.shape[0], cached.shape[1]))
+            return
         self.log_append("Building distance matrix (this may take some time)...")
         D = build_distance_matrix(self.points_for_calc)
         self.distance_matrix = D
+        self._save_cached_matrix(D)
         self.log_append("Distance matrix ready (shape: %d x %d)" % (D.shape[0], D.shape[1]))
 
+    def _cache_paths(self):
+        if self._csv_sha is None:
+            return None, None
+        base = os.path.join(self.CACHE_DIR, self._csv_sha)
+        return base + '.npy', base + '.json'
+
+    def _load_cached_matrix(self):
+        npy_path, meta_path = self._cache_paths()
+        if npy_path is None or not os.path.exists(npy_path) or not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            n = len(self.points_for_calc)
+            if info.get('shape') != [n, n]:
+                return None
+            # mmap: zero-copy load, pages come in on demand
+            return np.load(npy_path, mmap_mode='r')
+        except Exception as e:
+            self.log_append(f"Matrix cache read failed ({e}), recomputing")
+            return None
+
+    def _save_cached_matrix(self, D):
+        npy_path, meta_path = self._cache_paths()
+        if npy_path is None:
+            return
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            np.save(npy_path, D)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'shape': list(D.shape), 'dtype': str(D.dtype)}, f)
+        except Exception as e:
+            self.log_append(f"Matrix cache write failed ({e})")
+
     def on_start(self):
         if self.df is None:
             QMessageBox.warning(self, "No data", "Load CSV first.")
@@ -208,9 +261,9 @@ class MainWindow(QMainWindow):
     def on_finished(self, result: dict):
         self.log_append("Solver finished.")
         self.current_solution = result
-        # show final route
+        # show final route (an int32 ndarray — no implicit truthiness)
         route = result['route']
-        if route:
+        if route is not None and len(route) > 0:
             coords = self.points[route]
             self.map_widget.show_route(coords, ids=[self.ids[i] for i in route])
         self.btn_start.setEnabled(True)
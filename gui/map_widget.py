@@ -1,8 +1,10 @@
 # gui/map_widget.py
 import os
 import math
+import json
 import tempfile
 import folium
+from folium.plugins import FastMarkerCluster
 import numpy as np
 from PyQt5.QtCore import QUrl
 from PyQt5.QtWebEngineWidgets import QWebEngineView
@@ -12,12 +14,33 @@ class MapWidget(QWebEngineView):
         super().__init__(parent)
         self._tmpfile = None
         self._last_bounds = None
+        # True once a document with an updateRoute() hook is loaded,
+        # so route updates can go through runJavaScript instead of a reload
+        self._route_ready = False
+        self._page_loaded = False
+        # newest route received while the document was still loading; it is
+        # flushed from _on_load_finished instead of being dropped
+        self._pending_route = None
+        self.loadFinished.connect(self._on_load_finished)
+
+    def _on_load_finished(self, ok):
+        self._page_loaded = bool(ok)
+        if ok and self._route_ready and self._pending_route is not None:
+            points, self._pending_route = self._pending_route, None
+            self.page().runJavaScript(f"updateRoute({json.dumps(points)});")
 
     def _write_map(self, m: folium.Map):
+        # drop the previous temp file so repeated updates don't leak them
+        if self._tmpfile is not None:
+            try:
+                os.unlink(self._tmpfile)
+            except OSError:
+                pass
         # write to a temp file and load
         fd, path = tempfile.mkstemp(suffix=".html", prefix="tsp_map_")
         os.close(fd)
         m.save(path)
+        self._page_loaded = False
         self.load(QUrl.fromLocalFile(path))
         # remember path to allow later cleanup (not strictly necessary)
         self._tmpfile = path
@@ -31,12 +54,23 @@ class MapWidget(QWebEngineView):
         lons = points[:,1].astype(float)
         center = [float(lats.mean()), float(lons.mean())]
         m = folium.Map(location=center, zoom_start=6, control_scale=True)
-        # add a few markers (sparse)
-        n = len(points)
-        for i in range(0, n):
-            label = str(ids[i]) if ids is not None else str(i)
-            folium.CircleMarker(location=[float(lats[i]), float(lons[i])],
-                                radius=2, popup=label, fill=True).add_to(m)
+        # one clustered JS layer instead of n individual DOM markers:
+        # keeps the generated HTML small and the QWebEngine parse fast
+        if ids is not None:
+            data = [[float(lat), float(lon), str(i)]
+                    for lat, lon, i in zip(lats, lons, ids)]
+        else:
+            data = np.column_stack([lats, lons]).tolist()
+        callback = """
+        function (row) {
+            var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                        {radius: 2, fill: true});
+            if (row.length > 2) { marker.bindPopup(String(row[2])); }
+            return marker;
+        }"""
+        FastMarkerCluster(data, callback=callback).add_to(m)
+        self._route_ready = False
+        self._pending_route = None
         self._write_map(m)
 
     def show_route(self, coords: np.ndarray, ids=None):
@@ -45,13 +79,30 @@ class MapWidget(QWebEngineView):
             return
         lats = coords[:,0].astype(float)
         lons = coords[:,1].astype(float)
+        points = [[float(lat), float(lon)] for lat, lon in zip(lats, lons)]
+        if self._route_ready:
+            # the document is already loaded: push new coordinates into the
+            # existing polyline instead of re-rendering and reloading HTML
+            if self._page_loaded:
+                self._pending_route = None
+                self.page().runJavaScript(f"updateRoute({json.dumps(points)});")
+            else:
+                # still parsing the first route document: remember the newest
+                # coords (incl. the final route) rather than discarding them
+                self._pending_route = points
+            return
         center = [float(lats.mean()), float(lons.mean())]
         m = folium.Map(location=center, zoom_start=6, control_scale=True)
         # add polyline
-        points = [[float(lat), float(lon)] for lat, lon in zip(lats, lons)]
-        folium.PolyLine(points, color='blue', weight=3, opacity=0.8).add_to(m)
+        line = folium.PolyLine(points, color='blue', weight=3, opacity=0.8)
+        line.add_to(m)
         # add start marker
         folium.Marker(points[0], popup="Start", icon=folium.Icon(color='green')).add_to(m)
         # add end marker
         folium.Marker(points[-1], popup="End", icon=folium.Icon(color='red')).add_to(m)
+        # install the update hook used by subsequent show_route calls
+        script = ("<script>function updateRoute(c)"
+                  f"{{ {line.get_name()}.setLatLngs(c); }}</script>")
+        m.get_root().html.add_child(folium.Element(script))
         self._write_map(m)
+        self._route_ready = True
@@ -27,8 +27,10 @@ class SolverWorker(QObject):
         try:
             # forwarder for progress callback
             def cb(meta):
-                # if stop requested, we won't forcibly abort here; but we can emit progress
-                self.progress.emit(meta)
+                # if stop requested, we won't forcibly abort here; but we can emit progress.
+                # shallow-copy: two_opt reuses its payload dict in place, and the
+                # queued signal delivers on the GUI thread later
+                self.progress.emit(dict(meta))
             res = solve_tsp(items=self.items,
                             distance_matrix=self.distance_matrix,
                             method=self.method,
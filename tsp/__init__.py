@@ -2,14 +2,19 @@
 Package `tsp` — public exports for loader, distances, heuristics, solver, exporter.
 """
 from .loader import load_path, get_points, get_ids
-from .distances import build_distance_matrix, euclid_distance, route_length, validate_distance_matrix
-from .heuristics import nearest_neighbor, two_opt
-from .solver import solve_tsp
+from .distances import (build_distance_matrix, build_distance_matrix_packed,
+                        euclid_distance, packed_distance, route_length,
+                        route_length_packed, validate_distance_matrix)
+from .heuristics import (nearest_neighbor, nearest_neighbor_packed, two_opt,
+                         two_opt_coords, two_opt_gpu, two_opt_packed)
+from .solver import solve_tsp, clear_distance_cache
 from .exporter import export_route_ids, export_solution_distances, save_meta
 
 __all__ = [
     'load_path', 'get_points', 'get_ids',
-    'build_distance_matrix', 'euclid_distance', 'route_length', 'validate_distance_matrix',
-    'nearest_neighbor', 'two_opt', 'solve_tsp',
+    'build_distance_matrix', 'build_distance_matrix_packed', 'euclid_distance',
+    'packed_distance', 'route_length', 'route_length_packed', 'validate_distance_matrix',
+    'nearest_neighbor', 'nearest_neighbor_packed', 'two_opt', 'two_opt_coords',
+    'two_opt_gpu', 'two_opt_packed', 'solve_tsp', 'clear_distance_cache',
     'export_route_ids', 'export_solution_distances', 'save_meta'
 ]
\ No newline at end of file
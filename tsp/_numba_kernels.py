@@ -0,0 +1,40 @@
+"""
+_numba_kernels.py
+Shared numba plumbing: the optional-import guard (njit/prange fall back
+to no-ops so every kernel still runs as plain Python without numba) and
+kernels used from more than one module.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # numba is optional: fall back to a no-op decorator (pure-Python speed)
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _euclid_matrix(P, out):
+    """Pairwise Euclidean distances, one prange thread per row. For 2-D
+    points the direct loop beats the BLAS expansion: no intermediate
+    Gram matrix, one pass over the output."""
+    n = P.shape[0]
+    k = P.shape[1]
+    for i in prange(n):
+        for j in range(n):
+            s = 0.0
+            for c in range(k):
+                t = P[i, c] - P[j, c]
+                s += t * t
+            out[i, j] = math.sqrt(s)
@@ -3,10 +3,14 @@ distances.py
 Create distance matrix and distance_fn
 """
 
-from typing import Sequence, Optional
+from typing import Sequence, Optional, Tuple
+import math
+import os
 import numpy as np
 from scipy.spatial import distance
 
+from ._numba_kernels import NUMBA_AVAILABLE, njit, _euclid_matrix
+
 
 def euclid_distance(p1: Sequence[float], p2: Sequence[float]) -> float:
     """
@@ -17,25 +21,111 @@ def euclid_distance(p1: Sequence[float], p2: Sequence[float]) -> float:
     :return: euclidian distance between two points
     """
 
-    p1 = np.asarray(p1, dtype=np.float64)
-    p2 = np.asarray(p2, dtype=np.float64)
+    p1 = np.asarray(p1, dtype=np.float32)
+    p2 = np.asarray(p2, dtype=np.float32)
+    if p1.size == 2:
+        # common 2-D case: one hypot call, no temporary arrays
+        return math.hypot(float(p1[0] - p2[0]), float(p1[1] - p2[1]))
     return float(np.linalg.norm(p1 - p2))
 
 
+# compiled CUDA kernel, created on first use (requires a working GPU toolchain)
+_cuda_dist_kernel = None
+
+def _cuda_available() -> bool:
+    try:
+        from numba import cuda
+        return cuda.is_available()
+    except Exception:
+        return False
+
+def _build_distance_matrix_cuda(P: np.ndarray) -> np.ndarray:
+    """One GPU thread per D[i, j]; the result is copied back to host float32."""
+    from numba import cuda
+    global _cuda_dist_kernel
+    if _cuda_dist_kernel is None:
+        @cuda.jit
+        def _dist_kernel(pts, out):
+            i, j = cuda.grid(2)
+            n = pts.shape[0]
+            if i < n and j < n:
+                s = 0.0
+                for k in range(pts.shape[1]):
+                    t = pts[i, k] - pts[j, k]
+                    s += t * t
+                out[i, j] = math.sqrt(s)
+        _cuda_dist_kernel = _dist_kernel
+    n = P.shape[0]
+    d_pts = cuda.to_device(P)
+    d_out = cuda.device_array((n, n), dtype=np.float32)
+    threads = (16, 16)
+    blocks = ((n + 15) // 16, (n + 15) // 16)
+    _cuda_dist_kernel[blocks, threads](d_pts, d_out)
+    return d_out.copy_to_host()
+
+
 def build_distance_matrix(points: np.ndarray,
                           dtype: Optional[np.dtype] = np.float32) -> np.ndarray:
     """
-    Build full pairwise Euclidean distance matrix using scipy.spatial.distance.cdist.
-    Returns a symmetric matrix with zeros on diagonal.
+    Build full pairwise Euclidean distance matrix. With numba installed the
+    build runs as a parallel prange loop across cores; otherwise it falls
+    back to the BLAS squared expansion ||x||^2 + ||y||^2 - 2*x.y (one GEMM).
+    Everything stays float32 (no float64 upcast), which halves memory
+    traffic for large n. Returns a symmetric matrix with zeros on diagonal.
     """
-    points = np.asarray(points, dtype=np.float64)
-    if points.ndim != 2 or points.shape[1] < 1:
+    P = np.ascontiguousarray(points, dtype=np.float32)
+    if P.ndim != 2 or P.shape[1] < 1:
         raise ValueError("points must be a 2D array of shape (n, k)")
-    D = distance.cdist(points, points, metric='euclidean')
-    if dtype is not None:
+    # opt-in GPU path (TSP_BACKEND=cuda); falls through to CPU when no GPU
+    if os.environ.get('TSP_BACKEND', '').lower() == 'cuda' and _cuda_available():
+        D = _build_distance_matrix_cuda(P)
+        if dtype is not None and D.dtype != dtype:
+            D = D.astype(dtype)
+        return D
+    if NUMBA_AVAILABLE:
+        # multicore direct build, scales with physical cores
+        D = np.empty((P.shape[0], P.shape[0]), dtype=np.float32)
+        _euclid_matrix(P, D)
+    else:
+        G = P @ P.T  # BLAS sgemm
+        sq = np.einsum('ij,ij->i', P, P)
+        D2 = sq[:, None] + sq[None, :] - 2.0 * G
+        # clip tiny negatives caused by FP cancellation before sqrt
+        np.maximum(D2, 0.0, out=D2)
+        D = np.sqrt(D2, out=D2)
+        np.fill_diagonal(D, 0.0)
+    if dtype is not None and D.dtype != dtype:
         D = D.astype(dtype)
     return D
 
+def build_distance_matrix_packed(points: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Build the pairwise Euclidean distances in packed upper-triangle form:
+    a flat float32 array of the n(n-1)/2 unique entries, as produced by
+    scipy.spatial.distance.pdist. Halves memory versus the full matrix
+    (and pdist computes only half the pairs). Use `packed_distance` /
+    `route_length_packed` to read it. The full-matrix
+    `build_distance_matrix` remains the default for callers that want
+    plain D[i, j] indexing.
+    :return: (packed data, n)
+    """
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    if points.ndim != 2 or points.shape[1] < 1:
+        raise ValueError("points must be a 2D array of shape (n, k)")
+    data = distance.pdist(points, metric='euclidean').astype(np.float32)
+    return data, points.shape[0]
+
+
+@njit(cache=True, boundscheck=False)
+def packed_distance(data, n, i, j):
+    """Distance between cities i and j from the packed upper triangle."""
+    if i == j:
+        return 0.0
+    if i > j:
+        i, j = j, i
+    return data[i * (2 * n - i - 1) // 2 + (j - i - 1)]
+
+
 def route_length(route: Sequence[int],
                  D: np.ndarray,
                  closed: bool = False) -> float:
@@ -59,6 +149,27 @@ def route_length(route: Sequence[int],
         dist_sum += D[idx[-1], idx[0]]
     return float(dist_sum)
 
+@njit(cache=True, boundscheck=False)
+def route_length_packed(route, data, n, closed=False):
+    """
+    `route_length` equivalent over packed upper-triangle distances.
+    :param route: int array of point indices
+    :param data: packed distances from build_distance_matrix_packed
+    :param n: number of points
+    :param closed: if True, include distance from last to first
+    :return: total route length
+    """
+    m = route.shape[0]
+    if m < 2:
+        return 0.0
+    total = 0.0
+    for t in range(m - 1):
+        total += packed_distance(data, n, route[t], route[t + 1])
+    if closed:
+        total += packed_distance(data, n, route[m - 1], route[0])
+    return total
+
+
 def validate_distance_matrix(D: np.ndarray, atol: float = 1e-6) -> bool:
     """Sanity-check distance matrix: square, zero diagonal, symmetric and non-negative."""
     D = np.asarray(D)
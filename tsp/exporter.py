@@ -9,10 +9,11 @@ Provides functions to write:
 Default CSV format for solution.csv: "from_id;distance"
 where `from_id` is either the original id (if ids provided) or the integer index.
 """
-import csv
 import json
 from typing import List, Optional
 
+import numpy as np
+
 
 def export_route_ids(route_indices: List[int],
                      ids: Optional[List] = None,
@@ -21,14 +22,16 @@ def export_route_ids(route_indices: List[int],
     Write visiting order to a CSV file (one id per line).
     If `ids` is provided, use ids[index]; otherwise write numeric index.
     """
-    with open(path, 'w', encoding='utf-8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        if ids is None:
-            for idx in route_indices:
-                w.writerow([int(idx)])
-        else:
-            for idx in route_indices:
-                w.writerow([ids[int(idx)]])
+    idx = np.asarray(route_indices, dtype=np.int64)
+    if ids is None:
+        col = idx.tolist()
+    else:
+        # one vectorized gather instead of per-row Python list indexing
+        col = np.asarray(ids, dtype=object)[idx].tolist()
+    # the whole file is one pre-joined payload and a single write
+    payload = "\n".join(map(str, col)) + "\n"
+    with open(path, 'wb', buffering=1 << 18) as f:
+        f.write(payload.encode('utf-8'))
 
 
 def export_solution_distances(route_indices: List[int],
@@ -42,14 +45,17 @@ def export_solution_distances(route_indices: List[int],
     if len(route_indices) < 2:
         open(path, 'w', encoding='utf-8').close()
         return
-    idx = route_indices
-    with open(path, 'w', encoding='utf-8', newline='') as f:
-        w = csv.writer(f, delimiter=';')
-        for i in range(len(idx) - 1):
-            from_idx = idx[i]
-            dist = float(D[from_idx, idx[i + 1]])
-            left = ids[int(from_idx)] if ids is not None else int(from_idx)
-            w.writerow([left, repr(dist)])
+    # one fancy-index gather instead of n-1 scalar D[i, j] reads
+    idx = np.asarray(route_indices, dtype=np.int64)
+    dists = D[idx[:-1], idx[1:]].astype(np.float64)
+    if ids is not None:
+        left = np.asarray(ids, dtype=object)[idx[:-1]].tolist()
+    else:
+        left = idx[:-1].tolist()
+    # format everything up front and flush the file in one write
+    payload = "\n".join(f"{a};{b!r}" for a, b in zip(left, dists.tolist())) + "\n"
+    with open(path, 'wb', buffering=1 << 18) as f:
+        f.write(payload.encode('utf-8'))
 
 
 def save_meta(meta: dict, path: str = 'meta.json') -> None:
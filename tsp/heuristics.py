@@ -4,42 +4,277 @@ Nearest Neighbor and 2-opt algorithm realization
 """
 
 from typing import List, Tuple, Optional, Callable
+import functools
+import math
 import time
 import numpy as np
 
-from .distances import route_length
+from .distances import route_length, packed_distance, route_length_packed
+from ._numba_kernels import NUMBA_AVAILABLE, njit
 
 
-def nearest_neighbor(start_idx: int, D: np.ndarray) -> List[int]:
+@njit(cache=True, boundscheck=False, nogil=True)
+def _nn_core(start, D):
+    """Greedy nearest-neighbor walk as a tight typed loop: scan the current
+    row once per step, skipping visited cities. JIT-compiled when numba is
+    available."""
+    n = D.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    route = np.empty(n, dtype=np.int32)
+    route[0] = start
+    visited[start] = True
+    cur = start
+    for step in range(1, n):
+        best = -1
+        bd = np.inf
+        row = D[cur]
+        for k in range(n):
+            if not visited[k] and row[k] < bd:
+                bd = row[k]
+                best = k
+        route[step] = best
+        visited[best] = True
+        cur = best
+    return route
+
+
+@functools.lru_cache(maxsize=8)
+def _nn_core_for(n):
+    """
+    n-specialized `_nn_core`: the city count is a closure constant, which
+    numba bakes into the compiled code (known trip counts, unrollable
+    loops). numba cannot persist closures with cache=True, so each
+    (process, n) pair pays one compilation — worthwhile only for repeated
+    solves on the same instance size; the cache keeps the last few sizes.
+    """
+    @njit(boundscheck=False, nogil=True)
+    def core(start, D):
+        visited = np.zeros(n, dtype=np.bool_)
+        route = np.empty(n, dtype=np.int32)
+        route[0] = start
+        visited[start] = True
+        cur = start
+        for step in range(1, n):
+            best = -1
+            bd = np.inf
+            row = D[cur]
+            for k in range(n):
+                if not visited[k] and row[k] < bd:
+                    bd = row[k]
+                    best = k
+            route[step] = best
+            visited[best] = True
+            cur = best
+        return route
+    return core
+
+
+def nearest_neighbor(start_idx: int, D: np.ndarray,
+                     specialize: bool = False) -> np.ndarray:
     """
     Realization of greedy algorithm 'Nearest Neighbor'
 
     Desc: start from start_idx, then on every new step go to unvisited point, repeat
+    The row scan runs in `_nn_core` (numba @njit) when numba is installed;
+    otherwise a vectorized NumPy loop is used.
     :param start_idx: index to start from
     :param D: pairwise distance matrix
-    :return: route
+    :param specialize: compile a kernel with n baked in as a constant
+        (recompiles per distinct n — only pays off for repeated solves)
+    :return: route as int32 ndarray
     """
 
     n = D.shape[0]
     if n == 0:
-        return []
-    visited = np.zeros(n, dtype=bool)
+        return np.empty(0, dtype=np.int32)
 
     # tb sure not to quit the borders of array
     if start_idx < 0 or start_idx >= n:
         start_idx = 0
 
+    if NUMBA_AVAILABLE:
+        D = np.ascontiguousarray(D, dtype=np.float32)
+        core = _nn_core_for(n) if specialize else _nn_core
+        return core(np.int32(start_idx), D)
+
+    visited = np.zeros(n, dtype=bool)
     route = [int(start_idx)]
     visited[start_idx] = True
     current = start_idx
+    # one scratch row reused across steps instead of an allocation per step
+    scratch = np.empty(n, dtype=D.dtype)
     for _ in range(n - 1):
-        d_row = D[current].copy()
-        d_row[visited] = np.inf
-        next_idx = int(np.argmin(d_row))
+        np.copyto(scratch, D[current])
+        scratch[visited] = np.inf
+        next_idx = int(scratch.argmin())
         route.append(next_idx)
         visited[next_idx] = True
         current = next_idx
-    return route
+    return np.asarray(route, dtype=np.int32)
+
+
+def build_neighbor_lists(D: np.ndarray, k: int = 20) -> np.ndarray:
+    """
+    For every city return the indices of its k nearest other cities,
+    sorted by increasing distance (shape (n, k), int32).
+    Used by `two_opt` to restrict candidate moves to close-by cities.
+    """
+    n = D.shape[0]
+    k = min(k, n - 1)
+    # argpartition gets the k+1 smallest per row (incl. self), then sort those
+    part = np.argpartition(D, kth=k, axis=1)[:, :k + 1]
+    order = np.argsort(np.take_along_axis(D, part, axis=1), axis=1)
+    cand = np.take_along_axis(part, order, axis=1)
+    # drop self (distance 0 sorts first)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    for i in range(n):
+        row = cand[i]
+        neighbors[i] = row[row != i][:k]
+    return neighbors
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _reverse_segment(tour, pos, a, b):
+    """Reverse tour positions a..b inclusive (wrapping), keeping pos in sync.
+    Reverses the complementary segment instead when that one is shorter —
+    equivalent on a closed tour."""
+    n = tour.shape[0]
+    length = b - a
+    if length < 0:
+        length += n
+    length += 1
+    if length > n - length:
+        a, b = (b + 1) % n, (a - 1 + n) % n
+        length = n - length
+    for s in range(length // 2):
+        ia = (a + s) % n
+        ib = (b - s + n) % n
+        ca = tour[ia]
+        cb = tour[ib]
+        tour[ia] = cb
+        tour[ib] = ca
+        pos[cb] = ia
+        pos[ca] = ib
+
+
+@njit(cache=True, fastmath=True, boundscheck=False, nogil=True)
+def _two_opt_pass(tour, pos, dont_look, D, neighbors, improve_threshold):
+    """
+    One don't-look-bit sweep over the closed tour `tour` (open storage,
+    pos[city] = tour position). Only cities with a clear don't-look bit are
+    examined, and candidate moves come from each city's nearest-neighbor
+    list, so a sweep costs ~O(n*k) instead of O(n^2).
+    Returns (total_delta, improved). JIT-compiled when numba is available.
+    """
+    n = tour.shape[0]
+    k = neighbors.shape[1]
+    total_delta = 0.0
+    improved_any = False
+    for c1 in range(n):
+        if dont_look[c1]:
+            continue
+        improved_c1 = True
+        while improved_c1:
+            improved_c1 = False
+            for direction in range(2):
+                i = pos[c1]
+                if direction == 0:
+                    c2 = tour[(i + 1) % n]
+                else:
+                    c2 = tour[(i - 1 + n) % n]
+                d_c1c2 = D[c1, c2]
+                for m in range(k):
+                    c3 = neighbors[c1, m]
+                    d_c1c3 = D[c1, c3]
+                    if d_c1c3 >= d_c1c2:
+                        break  # neighbors sorted: no closer candidate left
+                    if c3 == c2:
+                        continue
+                    p3 = pos[c3]
+                    if direction == 0:
+                        c4 = tour[(p3 + 1) % n]
+                    else:
+                        c4 = tour[(p3 - 1 + n) % n]
+                    if c4 == c1:
+                        continue
+                    delta = (d_c1c3 + D[c2, c4]) - (d_c1c2 + D[c3, c4])
+                    if delta < -improve_threshold:
+                        # swap edges (c1,c2),(c3,c4) -> (c1,c3),(c2,c4)
+                        if direction == 0:
+                            _reverse_segment(tour, pos, (i + 1) % n, p3)
+                        else:
+                            _reverse_segment(tour, pos, p3, (i - 1 + n) % n)
+                        dont_look[c1] = False
+                        dont_look[c2] = False
+                        dont_look[c3] = False
+                        dont_look[c4] = False
+                        total_delta += delta
+                        improved_any = True
+                        improved_c1 = True
+                        break
+                if improved_c1:
+                    break
+        dont_look[c1] = True
+    return total_delta, improved_any
+
+
+@functools.lru_cache(maxsize=8)
+def _two_opt_pass_for(n, k):
+    """
+    (n, k)-specialized `_two_opt_pass`: tour length and candidate-list
+    width become closure constants in the compiled sweep. Same cache=True
+    caveat as `_nn_core_for` — one compilation per (process, n, k).
+    """
+    @njit(fastmath=True, boundscheck=False, nogil=True)
+    def sweep(tour, pos, dont_look, D, neighbors, improve_threshold):
+        total_delta = 0.0
+        improved_any = False
+        for c1 in range(n):
+            if dont_look[c1]:
+                continue
+            improved_c1 = True
+            while improved_c1:
+                improved_c1 = False
+                for direction in range(2):
+                    i = pos[c1]
+                    if direction == 0:
+                        c2 = tour[(i + 1) % n]
+                    else:
+                        c2 = tour[(i - 1 + n) % n]
+                    d_c1c2 = D[c1, c2]
+                    for m in range(k):
+                        c3 = neighbors[c1, m]
+                        d_c1c3 = D[c1, c3]
+                        if d_c1c3 >= d_c1c2:
+                            break
+                        if c3 == c2:
+                            continue
+                        p3 = pos[c3]
+                        if direction == 0:
+                            c4 = tour[(p3 + 1) % n]
+                        else:
+                            c4 = tour[(p3 - 1 + n) % n]
+                        if c4 == c1:
+                            continue
+                        delta = (d_c1c3 + D[c2, c4]) - (d_c1c2 + D[c3, c4])
+                        if delta < -improve_threshold:
+                            if direction == 0:
+                                _reverse_segment(tour, pos, (i + 1) % n, p3)
+                            else:
+                                _reverse_segment(tour, pos, p3, (i - 1 + n) % n)
+                            dont_look[c1] = False
+                            dont_look[c2] = False
+                            dont_look[c3] = False
+                            dont_look[c4] = False
+                            total_delta += delta
+                            improved_any = True
+                            improved_c1 = True
+                            break
+                    if improved_c1:
+                        break
+            dont_look[c1] = True
+        return total_delta, improved_any
+    return sweep
 
 
 def two_opt(route: List[int],
@@ -47,66 +282,562 @@ def two_opt(route: List[int],
             max_iters: int = 1000,
             improve_threshold: float = 1e-9,
             time_limit: Optional[float] = None,
-            progress_callback: Optional[Callable] = None) -> Tuple[List[int], float]:
+            progress_callback: Optional[Callable] = None,
+            k_neighbors: int = 20,
+            neighbors: Optional[np.ndarray] = None,
+            progress_interval: float = 1.0,
+            specialize: bool = False) -> Tuple[np.ndarray, float]:
     """
-    2-opt local search (first-improvement)
-    The function locks the route by adding the first element in the end,
-    then applying the method, finding improvement, repeat.
+    2-opt local search on the closed tour, accelerated with don't-look bits
+    and nearest-neighbor candidate lists: each sweep only revisits cities
+    near a recent improvement and only tries moves towards their k closest
+    cities. The hot sweep lives in `_two_opt_pass` (numba @njit when
+    available); time-limit checks and progress callbacks happen between
+    sweeps.
     :param route: the default route
     :param D: pairwise matrix
-    :param max_iters: maximum amount of iterations
+    :param max_iters: maximum amount of sweeps
     :param improve_threshold: the threshold for improving the part of the route
     :param time_limit: optional: limit of function completion time
     :param progress_callback:
-    :return: improved route with open length
+    :param k_neighbors: candidate-list size per city
+    :param neighbors: precomputed `build_neighbor_lists` result (optional)
+    :param progress_interval: min seconds between progress callbacks
+    :param specialize: use a sweep kernel with (n, k) baked in as constants
+        (recompiles per distinct size — for repeated same-size solves)
+    :return: improved route (int32 ndarray) with open length
     """
 
     if len(route) < 2:
-        return route, 0.0
+        return np.asarray(route, dtype=np.int32), 0.0
+
+    # contiguous typed private copy: reversals write into `best` in place
+    # and must never reach the caller's array (solve_tsp keeps the input
+    # tour as its fallback, and progress payloads may still reference it)
+    best = np.array(route, dtype=np.int32)
+    # the baseline accepted a closed route (first == last); the tour is
+    # stored open here, so strip the duplicated endpoint — otherwise it
+    # would corrupt pos[] and yield a non-permutation
+    if best.shape[0] > 1 and best[0] == best[-1]:
+        best = best[:-1]
+    if best.shape[0] < 2:
+        return best, 0.0
+    start_city = best[0]
+    D = np.ascontiguousarray(D, dtype=np.float32)
+    n = best.shape[0]
+
+    if neighbors is None:
+        neighbors = build_neighbor_lists(D, k=k_neighbors)
+    else:
+        neighbors = np.ascontiguousarray(neighbors, dtype=np.int32)
 
-    n = len(route)
+    # position of each city in the tour, kept in sync on every reversal
+    pos = np.empty(n, dtype=np.int32)
+    pos[best] = np.arange(n, dtype=np.int32)
+    dont_look = np.zeros(n, dtype=np.bool_)
 
-    # preparing closed route
-    tour = list(route)
-    if tour[0] != tour[-1]:
-        tour.append(tour[0])
-    n_closed = len(tour)
+    best_len = route_length(best, D, closed=True)
 
-    best = np.asarray(tour, dtype=int)
-    best_len = route_length(best, D, closed=False) + D[best[-1], best[0]]
+    sweep = (_two_opt_pass_for(n, neighbors.shape[1]) if specialize
+             else _two_opt_pass)
 
-    start_time = time.time()
+    start_time = time.perf_counter()
+    last_cb_time = start_time
     improved = True
     iters = 0
+    # one payload dict reused across callbacks: updated in place instead of
+    # reallocated every interval (consumers that keep it must copy — the GUI
+    # worker does)
+    payload = {'route': None, 'length_open': 0.0,
+               'length_closed': 0.0, 'time': 0.0}
 
     while improved and iters < max_iters:
-        improved = False
         iters += 1
-        for i in range(1, n_closed - 2):
-            # checking time limit
-            if time_limit is not None and (time.time() - start_time) > time_limit:
-                return best[:-1].tolist(), float(best_len - D[best[-1], best[0]])
-            for j in range(i + 1, n_closed - 1):
-                a, b = best[i - 1], best[i]
-                c, d = best[j], best[(j + 1) % n_closed]
-                delta = (D[a, c] + D[b, d]) - (D[a, b] + D[c, d])
-                if delta < -improve_threshold:
-                    # reversing (applying 2-opt)
-                    best[i:j+1] = best[i:j + 1][::-1]
-                    best_len += delta
-                    improved = True
-                    if progress_callback is not None:
-                        try:
-                            open_len = float(best_len - D[best[-1], best[0]])
-                            progress_callback({'route': best[:-1].tolist(),
-                                               'length_open': open_len,
-                                               'length_closed': float(best_len),
-                                               'time': time.time() - start_time})
-                        except Exception:
-                            pass
-                    break
-                if improved:
+        delta, improved = sweep(best, pos, dont_look, D, neighbors,
+                                improve_threshold)
+        best_len += delta
+        # checking time limit
+        now = time.perf_counter()
+        if time_limit is not None and (now - start_time) > time_limit:
+            break
+        # rate-limit callbacks: the O(n) route copy is the expensive part,
+        # so it runs at most once per progress_interval
+        if (improved and progress_callback is not None
+                and now - last_cb_time >= progress_interval):
+            last_cb_time = now
+            try:
+                # int32 snapshot, not tolist(): one object crosses the
+                # Qt thread boundary instead of n boxed ints
+                payload['route'] = best.copy()
+                payload['length_open'] = float(best_len - D[best[-1], best[0]])
+                payload['length_closed'] = float(best_len)
+                payload['time'] = now - start_time
+                progress_callback(payload)
+            except Exception:
+                pass
+
+    # re-root: wrap-aware reversals can rotate the tour, but callers
+    # expect the original first city (solve_tsp's start_idx) back at
+    # position 0; the closed length is rotation-invariant and the open
+    # length becomes comparable with the NN route's again
+    shift = int(pos[start_city])
+    if shift:
+        best = np.roll(best, -shift)
+    # best_len tracks the closed tour; one scalar read of the (mutable)
+    # closing edge converts it to the open length of the returned order
+    open_len = float(best_len - D[best[-1], best[0]])
+    return best, open_len
+
+
+def build_neighbor_lists_from_points(points: np.ndarray, k: int = 20,
+                                     chunk: int = 1024) -> np.ndarray:
+    """
+    `build_neighbor_lists` without materializing the full distance matrix:
+    distances are computed chunk-by-chunk against all points, so peak
+    memory is O(chunk * n) instead of O(n^2).
+    """
+    P = np.ascontiguousarray(points, dtype=np.float32)
+    n = P.shape[0]
+    k = min(k, n - 1)
+    sq = np.einsum('ij,ij->i', P, P)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        block = sq[lo:hi, None] + sq[None, :] - 2.0 * (P[lo:hi] @ P.T)
+        part = np.argpartition(block, kth=k, axis=1)[:, :k + 1]
+        order = np.argsort(np.take_along_axis(block, part, axis=1), axis=1)
+        cand = np.take_along_axis(part, order, axis=1)
+        for r, i in enumerate(range(lo, hi)):
+            row = cand[r]
+            neighbors[i] = row[row != i][:k]
+    return neighbors
+
+
+@njit(cache=True, fastmath=True, boundscheck=False, nogil=True)
+def _two_opt_pass_coords(tour, pos, dont_look, P, neighbors, improve_threshold):
+    """
+    `_two_opt_pass` with deltas computed from the (n, 2) coordinate array
+    instead of the n x n matrix: four hypot calls per candidate, but the
+    working set is 8n bytes and stays cache-resident for large n.
+    """
+    n = tour.shape[0]
+    k = neighbors.shape[1]
+    total_delta = 0.0
+    improved_any = False
+    for c1 in range(n):
+        if dont_look[c1]:
+            continue
+        improved_c1 = True
+        while improved_c1:
+            improved_c1 = False
+            for direction in range(2):
+                i = pos[c1]
+                if direction == 0:
+                    c2 = tour[(i + 1) % n]
+                else:
+                    c2 = tour[(i - 1 + n) % n]
+                d_c1c2 = math.hypot(P[c1, 0] - P[c2, 0], P[c1, 1] - P[c2, 1])
+                for m in range(k):
+                    c3 = neighbors[c1, m]
+                    d_c1c3 = math.hypot(P[c1, 0] - P[c3, 0], P[c1, 1] - P[c3, 1])
+                    if d_c1c3 >= d_c1c2:
+                        break  # neighbors sorted: no closer candidate left
+                    if c3 == c2:
+                        continue
+                    p3 = pos[c3]
+                    if direction == 0:
+                        c4 = tour[(p3 + 1) % n]
+                    else:
+                        c4 = tour[(p3 - 1 + n) % n]
+                    if c4 == c1:
+                        continue
+                    delta = (d_c1c3
+                             + math.hypot(P[c2, 0] - P[c4, 0], P[c2, 1] - P[c4, 1])
+                             - d_c1c2
+                             - math.hypot(P[c3, 0] - P[c4, 0], P[c3, 1] - P[c4, 1]))
+                    if delta < -improve_threshold:
+                        # swap edges (c1,c2),(c3,c4) -> (c1,c3),(c2,c4)
+                        if direction == 0:
+                            _reverse_segment(tour, pos, (i + 1) % n, p3)
+                        else:
+                            _reverse_segment(tour, pos, p3, (i - 1 + n) % n)
+                        dont_look[c1] = False
+                        dont_look[c2] = False
+                        dont_look[c3] = False
+                        dont_look[c4] = False
+                        total_delta += delta
+                        improved_any = True
+                        improved_c1 = True
+                        break
+                if improved_c1:
                     break
+        dont_look[c1] = True
+    return total_delta, improved_any
+
+
+def two_opt_coords(route: List[int],
+                   points: np.ndarray,
+                   max_iters: int = 1000,
+                   improve_threshold: float = 1e-9,
+                   time_limit: Optional[float] = None,
+                   progress_callback: Optional[Callable] = None,
+                   k_neighbors: int = 20,
+                   neighbors: Optional[np.ndarray] = None,
+                   progress_interval: float = 1.0) -> Tuple[np.ndarray, float]:
+    """
+    `two_opt` working directly on (n, 2) coordinates: no distance matrix
+    needed, so instances too large for the 4*n^2-byte matrix stay
+    feasible. Deltas cost four hypot calls per candidate against a tiny
+    points array instead of four random gathers into D.
+    Parameters mirror `two_opt` with `points` in place of `D`.
+    :return: improved route with open length
+    """
+
+    if len(route) < 2:
+        return np.asarray(route, dtype=np.int32), 0.0
+
+    # private copy — reversals must not write through the caller's array
+    best = np.array(route, dtype=np.int32)
+    # the baseline accepted a closed route (first == last); the tour is
+    # stored open here, so strip the duplicated endpoint — otherwise it
+    # would corrupt pos[] and yield a non-permutation
+    if best.shape[0] > 1 and best[0] == best[-1]:
+        best = best[:-1]
+    if best.shape[0] < 2:
+        return best, 0.0
+    start_city = best[0]
+    P = np.ascontiguousarray(points, dtype=np.float32)
+    n = best.shape[0]
+
+    if neighbors is None:
+        neighbors = build_neighbor_lists_from_points(P, k=k_neighbors)
+    else:
+        neighbors = np.ascontiguousarray(neighbors, dtype=np.int32)
+
+    pos = np.empty(n, dtype=np.int32)
+    pos[best] = np.arange(n, dtype=np.int32)
+    dont_look = np.zeros(n, dtype=np.bool_)
+
+    diffs = P[best] - P[np.roll(best, -1)]
+    best_len = float(np.hypot(diffs[:, 0], diffs[:, 1]).sum())
 
+    start_time = time.perf_counter()
+    last_cb_time = start_time
+    improved = True
+    iters = 0
+    # reused callback payload, same contract as in two_opt
+    payload = {'route': None, 'length_open': 0.0,
+               'length_closed': 0.0, 'time': 0.0}
+
+    while improved and iters < max_iters:
+        iters += 1
+        delta, improved = _two_opt_pass_coords(best, pos, dont_look, P,
+                                               neighbors, improve_threshold)
+        best_len += delta
+        now = time.perf_counter()
+        if time_limit is not None and (now - start_time) > time_limit:
+            break
+        if (improved and progress_callback is not None
+                and now - last_cb_time >= progress_interval):
+            last_cb_time = now
+            try:
+                closing = math.hypot(P[best[-1], 0] - P[best[0], 0],
+                                     P[best[-1], 1] - P[best[0], 1])
+                payload['route'] = best.copy()
+                payload['length_open'] = float(best_len - closing)
+                payload['length_closed'] = float(best_len)
+                payload['time'] = now - start_time
+                progress_callback(payload)
+            except Exception:
+                pass
+
+    # re-root: wrap-aware reversals can rotate the tour, but callers
+    # expect the original first city (solve_tsp's start_idx) back at
+    # position 0; the closed length is rotation-invariant and the open
+    # length becomes comparable with the NN route's again
+    shift = int(pos[start_city])
+    if shift:
+        best = np.roll(best, -shift)
+    closing = math.hypot(P[best[-1], 0] - P[best[0], 0],
+                         P[best[-1], 1] - P[best[0], 1])
+    return best, float(best_len - closing)
+
+
+def two_opt_gpu(route: List[int],
+                D: np.ndarray,
+                max_iters: int = 1000,
+                improve_threshold: float = 1e-9,
+                time_limit: Optional[float] = None,
+                progress_callback: Optional[Callable] = None,
+                progress_interval: float = 1.0) -> Tuple[np.ndarray, float]:
+    """
+    Best-improvement 2-opt with the sweep evaluated on the GPU: each sweep
+    computes the full delta matrix for every (i, j) edge pair with CuPy
+    broadcasting, reduces to the best move with argmin, and applies the
+    reversal on the CPU. Falls back to the CPU `two_opt` when CuPy is not
+    installed. Parameters mirror `two_opt` (no candidate lists — the GPU
+    evaluates all pairs anyway).
+    :return: improved route with open length
+    """
+    try:
+        import cupy as cp
+    except ImportError:
+        return two_opt(route, D, max_iters=max_iters,
+                       improve_threshold=improve_threshold,
+                       time_limit=time_limit,
+                       progress_callback=progress_callback,
+                       progress_interval=progress_interval)
+
+    # private copy — reversals must not write through the caller's array
+    best = np.array(route, dtype=np.int64)
+    # the baseline accepted a closed route (first == last); the tour is
+    # stored open here, so strip the duplicated endpoint — otherwise it
+    # would corrupt pos[] and yield a non-permutation
+    if best.shape[0] > 1 and best[0] == best[-1]:
+        best = best[:-1]
+    if best.shape[0] < 2:
+        return best.astype(np.int32), 0.0
+    start_city = best[0]
+    n = best.shape[0]
+    D = np.ascontiguousarray(D, dtype=np.float32)
+    if n < 4:
+        return best.astype(np.int32), float(route_length(best, D, closed=False))
+
+    D_gpu = cp.asarray(D)  # uploaded once, reused every sweep
+    best_len = route_length(best, D, closed=True)
+
+    start_time = time.perf_counter()
+    last_cb_time = start_time
+    iters = 0
+    # reused callback payload, same contract as in two_opt
+    payload = {'route': None, 'length_open': 0.0,
+               'length_closed': 0.0, 'time': 0.0}
+
+    while iters < max_iters:
+        iters += 1
+        rg = cp.asarray(best)
+        succ = cp.roll(rg, -1)
+        edge = D_gpu[rg, succ]
+        # delta[i, j] for swapping edges (r[i],succ[i]) and (r[j],succ[j]);
+        # lower triangle/diagonal stay 0 and can never win the argmin
+        delta = (D_gpu[rg[:, None], rg[None, :]]
+                 + D_gpu[succ[:, None], succ[None, :]]
+                 - edge[:, None] - edge[None, :])
+        delta = cp.triu(delta, k=1)
+        flat = int(cp.argmin(delta))
+        i, j = divmod(flat, n)
+        dmin = float(delta[i, j])
+        if dmin >= -improve_threshold:
+            break
+        best[i + 1:j + 1] = best[i + 1:j + 1][::-1]
+        best_len += dmin
+        now = time.perf_counter()
+        if time_limit is not None and (now - start_time) > time_limit:
+            break
+        if (progress_callback is not None
+                and now - last_cb_time >= progress_interval):
+            last_cb_time = now
+            try:
+                payload['route'] = best.astype(np.int32)
+                payload['length_open'] = float(best_len - D[best[-1], best[0]])
+                payload['length_closed'] = float(best_len)
+                payload['time'] = now - start_time
+                progress_callback(payload)
+            except Exception:
+                pass
+
+    # re-root: wrap-aware reversals can rotate the tour, but callers
+    # expect the original first city (solve_tsp's start_idx) back at
+    # position 0; the closed length is rotation-invariant and the open
+    # length becomes comparable with the NN route's again
+    shift = int(np.where(best == start_city)[0][0])
+    if shift:
+        best = np.roll(best, -shift)
     open_len = float(best_len - D[best[-1], best[0]])
-    return best[:-1].tolist(), open_len
+    return best.astype(np.int32), open_len
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _nn_core_packed(start, data, n):
+    """`_nn_core` over packed upper-triangle distances: each step scans all
+    unvisited cities through `packed_distance` instead of one matrix row."""
+    visited = np.zeros(n, dtype=np.bool_)
+    route = np.empty(n, dtype=np.int32)
+    route[0] = start
+    visited[start] = True
+    cur = start
+    for step in range(1, n):
+        best = -1
+        bd = np.inf
+        for k in range(n):
+            if not visited[k]:
+                d = packed_distance(data, n, cur, k)
+                if d < bd:
+                    bd = d
+                    best = k
+        route[step] = best
+        visited[best] = True
+        cur = best
+    return route
+
+
+def nearest_neighbor_packed(start_idx: int, data: np.ndarray, n: int) -> np.ndarray:
+    """
+    `nearest_neighbor` over packed upper-triangle distances from
+    `build_distance_matrix_packed` — same greedy walk without ever
+    materializing the full n x n matrix.
+    :param start_idx: index to start from
+    :param data: packed distances
+    :param n: number of points
+    :return: route as int32 ndarray
+    """
+    if n == 0:
+        return np.empty(0, dtype=np.int32)
+    if start_idx < 0 or start_idx >= n:
+        start_idx = 0
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    return _nn_core_packed(np.int32(start_idx), data, n)
+
+
+@njit(cache=True, fastmath=True, boundscheck=False, nogil=True)
+def _two_opt_pass_packed(tour, pos, dont_look, data, n, neighbors,
+                         improve_threshold):
+    """
+    `_two_opt_pass` over packed upper-triangle distances: identical sweep,
+    with every D[a, b] read replaced by a `packed_distance` lookup (four
+    per candidate move). Returns (total_delta, improved).
+    """
+    k = neighbors.shape[1]
+    total_delta = 0.0
+    improved_any = False
+    for c1 in range(n):
+        if dont_look[c1]:
+            continue
+        improved_c1 = True
+        while improved_c1:
+            improved_c1 = False
+            for direction in range(2):
+                i = pos[c1]
+                if direction == 0:
+                    c2 = tour[(i + 1) % n]
+                else:
+                    c2 = tour[(i - 1 + n) % n]
+                d_c1c2 = packed_distance(data, n, c1, c2)
+                for m in range(k):
+                    c3 = neighbors[c1, m]
+                    d_c1c3 = packed_distance(data, n, c1, c3)
+                    if d_c1c3 >= d_c1c2:
+                        break  # neighbors sorted: no closer candidate left
+                    if c3 == c2:
+                        continue
+                    p3 = pos[c3]
+                    if direction == 0:
+                        c4 = tour[(p3 + 1) % n]
+                    else:
+                        c4 = tour[(p3 - 1 + n) % n]
+                    if c4 == c1:
+                        continue
+                    delta = (d_c1c3 + packed_distance(data, n, c2, c4)) \
+                        - (d_c1c2 + packed_distance(data, n, c3, c4))
+                    if delta < -improve_threshold:
+                        if direction == 0:
+                            _reverse_segment(tour, pos, (i + 1) % n, p3)
+                        else:
+                            _reverse_segment(tour, pos, p3, (i - 1 + n) % n)
+                        dont_look[c1] = False
+                        dont_look[c2] = False
+                        dont_look[c3] = False
+                        dont_look[c4] = False
+                        total_delta += delta
+                        improved_any = True
+                        improved_c1 = True
+                        break
+                if improved_c1:
+                    break
+        dont_look[c1] = True
+    return total_delta, improved_any
+
+
+def two_opt_packed(route: List[int],
+                   data: np.ndarray,
+                   n: int,
+                   max_iters: int = 1000,
+                   improve_threshold: float = 1e-9,
+                   time_limit: Optional[float] = None,
+                   progress_callback: Optional[Callable] = None,
+                   k_neighbors: int = 20,
+                   neighbors: Optional[np.ndarray] = None,
+                   progress_interval: float = 1.0) -> Tuple[np.ndarray, float]:
+    """
+    `two_opt` over packed upper-triangle distances: half the memory (and
+    half the working set the sweep touches) at the cost of a little index
+    arithmetic per lookup. `neighbors` should come from
+    `build_neighbor_lists_from_points` since no full matrix exists.
+    Parameters and return value mirror `two_opt`.
+    :return: improved route with open length
+    """
+
+    if len(route) < 2:
+        return np.asarray(route, dtype=np.int32), 0.0
+
+    # private copy — reversals must not write through the caller's array
+    best = np.array(route, dtype=np.int32)
+    # the baseline accepted a closed route (first == last); the tour is
+    # stored open here, so strip the duplicated endpoint — otherwise it
+    # would corrupt pos[] and yield a non-permutation
+    if best.shape[0] > 1 and best[0] == best[-1]:
+        best = best[:-1]
+    if best.shape[0] < 2:
+        return best, 0.0
+    start_city = best[0]
+    data = np.ascontiguousarray(data, dtype=np.float32)
+
+    if neighbors is None:
+        raise ValueError("two_opt_packed needs precomputed neighbors "
+                         "(see build_neighbor_lists_from_points)")
+    neighbors = np.ascontiguousarray(neighbors, dtype=np.int32)
+
+    pos = np.empty(n, dtype=np.int32)
+    pos[best] = np.arange(n, dtype=np.int32)
+    dont_look = np.zeros(n, dtype=np.bool_)
+
+    best_len = route_length_packed(best, data, n, closed=True)
+
+    start_time = time.perf_counter()
+    last_cb_time = start_time
+    improved = True
+    iters = 0
+    # reused callback payload, same contract as in two_opt
+    payload = {'route': None, 'length_open': 0.0,
+               'length_closed': 0.0, 'time': 0.0}
+
+    while improved and iters < max_iters:
+        iters += 1
+        delta, improved = _two_opt_pass_packed(best, pos, dont_look, data,
+                                               n, neighbors, improve_threshold)
+        best_len += delta
+        now = time.perf_counter()
+        if time_limit is not None and (now - start_time) > time_limit:
+            break
+        if (improved and progress_callback is not None
+                and now - last_cb_time >= progress_interval):
+            last_cb_time = now
+            try:
+                closing = packed_distance(data, n, best[-1], best[0])
+                payload['route'] = best.copy()
+                payload['length_open'] = float(best_len - closing)
+                payload['length_closed'] = float(best_len)
+                payload['time'] = now - start_time
+                progress_callback(payload)
+            except Exception:
+                pass
+
+    # re-root: wrap-aware reversals can rotate the tour, but callers
+    # expect the original first city (solve_tsp's start_idx) back at
+    # position 0; the closed length is rotation-invariant and the open
+    # length becomes comparable with the NN route's again
+    shift = int(pos[start_city])
+    if shift:
+        best = np.roll(best, -shift)
+    closing = packed_distance(data, n, best[-1], best[0])
+    return best, float(best_len - closing)
@@ -28,6 +28,41 @@ def _detect_delimiter(path: str, sample_lines: int = 5) -> str:
         # fallback to comma
         return ','
 
+_DTYPES = {
+    'id': object,
+    'region': object,
+    'municipality': object,
+    'settlement': object,
+    'type': object,
+    'latitude_dd': float,
+    'longitude_dd': float
+}
+
+def _read_csv(path: str, sep: str) -> pd.DataFrame:
+    """
+    Read with pyarrow first (multi-threaded tokenizer, much faster on
+    multi-MB files); fall back to the default engine when pyarrow is
+    unavailable or rejects the file. The text columns are pinned to string
+    in the arrow schema so ids like "007" survive verbatim — pandas'
+    engine='pyarrow' wrapper infers int64 before applying dtype=object
+    and would corrupt them.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+    except ImportError:
+        return pd.read_csv(path, sep=sep, dtype=_DTYPES)
+    try:
+        column_types = {c: pa.string() if t is object else pa.float64()
+                        for c, t in _DTYPES.items()}
+        table = pacsv.read_csv(
+            path,
+            parse_options=pacsv.ParseOptions(delimiter=sep),
+            convert_options=pacsv.ConvertOptions(column_types=column_types))
+        return table.to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError, TypeError):
+        return pd.read_csv(path, sep=sep, dtype=_DTYPES)
+
 def load_path(path: str,
               sep: Optional[str] = ';',
               required_cols: Optional[List[str]] = None,
@@ -40,45 +75,24 @@ def load_path(path: str,
     if required_cols is None:
         required_cols = REQUIRED_COLUMNS_DEFAULT
 
+    detected = None  # sniff at most once per call
+
     # try initial read with given sep first
     try:
-        df = pd.read_csv(path, sep=sep, dtype={
-            'id': object,
-            'region': object,
-            'municipality': object,
-            'settlement': object,
-            'type': object,
-            'latitude_dd': float,
-            'longitude_dd': float
-        })
-    except Exception as e:
+        df = _read_csv(path, sep=sep)
+    except Exception:
         # if reading with given sep fails, attempt autodetect
         detected = _detect_delimiter(path)
-        df = pd.read_csv(path, sep=detected, dtype={
-            'id': object,
-            'region': object,
-            'municipality': object,
-            'settlement': object,
-            'type': object,
-            'latitude_dd': float,
-            'longitude_dd': float
-        })
+        df = _read_csv(path, sep=detected)
 
     # validate columns
     missing = [c for c in required_cols if c not in df.columns]
     if missing:
         # try autodetect if we haven't already
-        detected = _detect_delimiter(path)
+        if detected is None:
+            detected = _detect_delimiter(path)
         if sep != detected:
-            df = pd.read_csv(path, sep=detected, dtype={
-                'id': object,
-                'region': object,
-                'municipality': object,
-                'settlement': object,
-                'type': object,
-                'latitude_dd': float,
-                'longitude_dd': float
-            })
+            df = _read_csv(path, sep=detected)
             missing = [c for c in required_cols if c not in df.columns]
 
     if missing:
@@ -1,22 +1,154 @@
 #  tsp/solver.py
+import hashlib
+import os
 import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional, Callable, Dict
 
-from .distances import build_distance_matrix, route_length
-from .heuristics import nearest_neighbor, two_opt
+from .distances import (build_distance_matrix, build_distance_matrix_packed,
+                        packed_distance, route_length,
+                        validate_distance_matrix)
+from .heuristics import (build_neighbor_lists, build_neighbor_lists_from_points,
+                         nearest_neighbor, nearest_neighbor_packed, two_opt,
+                         two_opt_gpu, two_opt_packed)
+
+# memoized Euclidean distance matrices for repeated solve_tsp calls on the
+# same points (e.g. multi-start experiments); bounded, insertion-order evict
+_D_CACHE: Dict[tuple, np.ndarray] = {}
+_D_CACHE_MAX = 4
+
+# TSP_VALIDATE=1 turns on the full (O(n^2)) distance-matrix validation per
+# solve; the cheap shape checks are asserts, stripped under `python -O`
+_VALIDATE = os.environ.get("TSP_VALIDATE", "0") == "1"
+
+def _points_fingerprint(points: np.ndarray) -> tuple:
+    digest = hashlib.blake2b(np.ascontiguousarray(points).tobytes(),
+                             digest_size=8).hexdigest()
+    return (points.shape, points.dtype.str, digest)
+
+def clear_distance_cache() -> None:
+    """Drop all matrices memoized by solve_tsp."""
+    _D_CACHE.clear()
 
 def _compute_distance_matrix(points: np.ndarray, distance_fn: Optional[Callable] = None) -> np.ndarray:
     if distance_fn is None:
+        # common case: no Python-level loop — build_distance_matrix uses the
+        # parallel numba kernel, or the one-GEMM expansion
+        # ||x||^2 + ||y||^2 - 2*x.y without numba
         return build_distance_matrix(points)
     n = points.shape[0]
-    D = np.empty((n, n), dtype=np.float64)
+    # try evaluating distance_fn one row at a time (n vectorized calls);
+    # fall back to the O(n^2) scalar loop only if the fn can't broadcast
+    try:
+        D = np.empty((n, n), dtype=np.float32)
+        for i in range(n):
+            row = np.asarray(distance_fn(points[i:i + 1], points), dtype=np.float32)
+            D[i] = row.reshape(n)
+        # a scalar-only fn can broadcast into n elements by accident (e.g.
+        # when n == k), producing garbage that still reshapes cleanly —
+        # spot-check one entry against a scalar call before trusting it
+        j = n - 1
+        probe = np.float32(distance_fn(points[0], points[j]))
+        if D[0, 0] == 0.0 and abs(D[0, j] - probe) <= 1e-4 * max(1.0, abs(probe)):
+            return D
+    except Exception:
+        pass
+    # float32 from the start: no float64 intermediate to allocate and copy
+    D = np.empty((n, n), dtype=np.float32)
     for i in range(n):
         for j in range(i, n):
-            d = float(distance_fn(points[i], points[j]))
+            d = np.float32(distance_fn(points[i], points[j]))
             D[i, j] = d
             D[j, i] = d
-    return D.astype(np.float32)
+    return D
+
+def _solve_tsp_packed(items, distance_fn, distance_matrix, method, params,
+                      time_limit, progress_callback, t0):
+    """
+    solve_tsp body for pack_symmetric=True: distances live in the packed
+    upper triangle (see build_distance_matrix_packed), halving memory and
+    the working set the 2-opt sweep touches. Restricted to the default
+    Euclidean metric, CPU methods and a single start.
+    """
+    if method not in ('nn', 'nn+2opt'):
+        raise ValueError(f"pack_symmetric supports 'nn' and 'nn+2opt', not '{method}'")
+    # reject unsupported options loudly rather than silently ignoring them
+    if distance_fn is not None:
+        raise ValueError("pack_symmetric supports the default Euclidean "
+                         "metric only, not a custom distance_fn")
+    if int(params.get('n_starts', 1)) > 1:
+        raise ValueError("pack_symmetric supports a single start "
+                         "(n_starts must be 1)")
+
+    points = None
+    if distance_matrix is not None:
+        D = np.asarray(distance_matrix, dtype=np.float32)
+        assert D.ndim == 2 and D.shape[0] == D.shape[1], \
+            "distance_matrix must be a square 2D array"
+        n = D.shape[0]
+        # neighbors come from the full matrix while we still have it
+        neighbors = build_neighbor_lists(D) if method == 'nn+2opt' else None
+        data = np.ascontiguousarray(D[np.triu_indices(n, k=1)])
+        del D
+    else:
+        if items is None:
+            raise ValueError("Either items or distance_matrix must be provided")
+        points = np.asarray(items)
+        if points.ndim != 2:
+            raise ValueError("items must be a 2D array with shape (n,k)")
+        # pdist + chunked neighbor search: the full n x n matrix is never built
+        data, n = build_distance_matrix_packed(points)
+        neighbors = (build_neighbor_lists_from_points(points)
+                     if method == 'nn+2opt' else None)
+
+    start_idx = int(params.get('start_idx', 3753))
+    start_idx = start_idx if 0 <= start_idx < n else 0
+    max_iters = int(params.get('max_iters', 1000))
+
+    best_route = nearest_neighbor_packed(start_idx, data, n)
+
+    if method == 'nn+2opt' and n >= 4:
+        rem_time = None
+        if time_limit is not None:
+            rem_time = max(0.0, time_limit - (time.perf_counter() - t0))
+        new_route, best_open_len = two_opt_packed(
+            best_route, data, n, max_iters=max_iters, time_limit=rem_time,
+            progress_callback=progress_callback, neighbors=neighbors)
+        best_route = new_route
+    else:
+        best_route_64 = best_route.astype(np.int64)
+        a, b = best_route_64[:-1], best_route_64[1:]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        best_open_len = float(data[lo * (2 * n - lo - 1) // 2 + (hi - lo - 1)].sum())
+        if progress_callback is not None:
+            closing = packed_distance(data, n, int(best_route[-1]), int(best_route[0]))
+            progress_callback({'route': best_route,
+                               'length_open': best_open_len,
+                               'length_closed': float(best_open_len + closing),
+                               'time': time.perf_counter() - t0})
+
+    # consecutive-edge distances via the same packed index arithmetic
+    if len(best_route) < 2:
+        distances = np.empty(0, dtype=np.float32)
+        best_closed_len = best_open_len
+    else:
+        idx = best_route.astype(np.int64)
+        a, b = idx[:-1], idx[1:]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        distances = data[lo * (2 * n - lo - 1) // 2 + (hi - lo - 1)].copy()
+        best_closed_len = best_open_len + packed_distance(
+            data, n, int(best_route[-1]), int(best_route[0]))
+
+    meta = {
+        'method': method,
+        'n': n,
+        'time_seconds': time.perf_counter() - t0,
+        'best_open_length': float(best_open_len),
+        'best_closed_length': float(best_closed_len),
+        'start_idx': start_idx
+    }
+    return {'route': best_route, 'lengths': distances, 'meta': meta}
 
 def solve_tsp(items: Any = None,
               distance_fn: Optional[Callable] = None,
@@ -24,20 +156,33 @@ def solve_tsp(items: Any = None,
               method: str = 'nn+2opt',
               params: Optional[Dict] = None,
               time_limit: Optional[float] = None,
-              progress_callback: Optional[Callable] = None) -> dict:
+              progress_callback: Optional[Callable] = None,
+              pack_symmetric: bool = False) -> dict:
     """
     Deterministic TSP solver wrapper.
     - items: np.ndarray (n,k) OR None if distance_matrix provided
     - distance_matrix: full pairwise distances (n x n) or None
-    - method: 'nn' or 'nn+2opt'
-    - params: {'start_idx': int, 'max_iters': int}
+    - method: 'nn', 'nn+2opt' or 'nn+2opt-gpu'
+    - params: {'start_idx': int, 'max_iters': int, 'n_starts': int,
+      'seed': int} — n_starts > 1 runs that many NN+2-opt starts in
+      parallel threads and keeps the best tour
     - time_limit: global time limit in seconds (optional)
     - progress_callback: called with progress dicts
+    - pack_symmetric: store distances as the packed upper triangle (half
+      the memory of the full matrix; the full n x n array is never built
+      when items are given). Supports 'nn' and 'nn+2opt', single start,
+      default Euclidean metric only.
+    Returns {'route': int32 ndarray, 'lengths': float32 ndarray of n-1
+    consecutive edge distances, 'meta': dict}.
     """
-    t0 = time.time()
+    t0 = time.perf_counter()
     if params is None:
         params = {}
 
+    if pack_symmetric:
+        return _solve_tsp_packed(items, distance_fn, distance_matrix, method,
+                                 params, time_limit, progress_callback, t0)
+
     # Prepare D
     if distance_matrix is None:
         if items is None:
@@ -45,113 +190,152 @@ def solve_tsp(items: Any = None,
         points = np.asarray(items)
         if points.ndim != 2:
             raise ValueError("items must be a 2D array with shape (n,k)")
-        D = _compute_distance_matrix(points, distance_fn=distance_fn)
+        if distance_fn is None:
+            # cache only the default metric: custom fns can't be keyed safely
+            key = _points_fingerprint(points)
+            D = _D_CACHE.get(key)
+            if D is None:
+                D = _compute_distance_matrix(points)
+                if len(_D_CACHE) >= _D_CACHE_MAX:
+                    _D_CACHE.pop(next(iter(_D_CACHE)))
+                _D_CACHE[key] = D
+        else:
+            D = _compute_distance_matrix(points, distance_fn=distance_fn)
     else:
-        D = np.asarray(distance_matrix)
+        # C-contiguous float32 keeps downstream numba kernels on one
+        # signature and fancy indexing on the fast path; no copy is made
+        # when the caller already provides that layout (incl. mmap loads)
+        D = np.ascontiguousarray(distance_matrix, dtype=np.float32)
 
     # basic sanity checks on D
-    if D.ndim != 2 or D.shape[0] != D.shape[1]:
-        raise ValueError("distance_matrix must be a square 2D array")
+    assert D.ndim == 2 and D.shape[0] == D.shape[1], \
+        "distance_matrix must be a square 2D array"
+    if _VALIDATE and not validate_distance_matrix(D):
+        raise ValueError("distance_matrix failed validation "
+                         "(square, zero diagonal, symmetric, non-negative)")
 
     n = D.shape[0]
     # default start: Krasnoyarsk id index 3753 (safety fallback to 0)
-    default_start = int(params.get('start_idx', 3753))
-    if default_start < 0 or default_start >= n:
-        start_idx = 0
-    else:
-        start_idx = default_start
+    start_idx = int(params.get('start_idx', 3753))
+    start_idx = start_idx if 0 <= start_idx < n else 0
+    max_iters = int(params.get('max_iters', 1000))
 
     best_route = None
     best_open_len = float('inf')
-    best_closed_len = float('inf')
 
     # -------------------------
     # Method: nearest neighbor
     # -------------------------
     if method == 'nn':
-        try:
-            route = nearest_neighbor(start_idx, D)
-        except Exception as e:
-            raise RuntimeError(f"nearest_neighbor failed: {e}")
+        # exceptions from the heuristic propagate untouched — the original
+        # traceback is more informative than a reformatted RuntimeError
+        route = nearest_neighbor(start_idx, D)
 
         # safety: validate route
         if route is None or len(route) == 0:
             raise RuntimeError("nearest_neighbor returned empty route")
 
-        # compute lengths
-        open_len = float(route_length(route, D, closed=False))
-        closed_len = float(open_len + D[route[-1], route[0]]) if len(route) > 0 else 0.0
+        # route is already an int32 ndarray, route_length a Python float
+        open_len = route_length(route, D, closed=False)
         best_route = route
         best_open_len = open_len
-        best_closed_len = closed_len
         if progress_callback is not None:
+            # closed length is only needed for display: derive it from the
+            # open length with one extra D lookup instead of a second pass
             progress_callback({'route': best_route,
                                'length_open': best_open_len,
-                               'length_closed': best_closed_len,
-                               'time': time.time() - t0})
+                               'length_closed': float(best_open_len + D[best_route[-1], best_route[0]]),
+                               'time': time.perf_counter() - t0})
 
     # -------------------------
     # Method: NN + 2-opt
     # -------------------------
-    elif method == 'nn+2opt':
-        try:
-            route = nearest_neighbor(start_idx, D)
-        except Exception as e:
-            raise RuntimeError(f"nearest_neighbor failed: {e}")
+    elif method in ('nn+2opt', 'nn+2opt-gpu'):
+        route = nearest_neighbor(start_idx, D)
 
         if route is None or len(route) == 0:
             raise RuntimeError("nearest_neighbor returned empty route")
 
-        open_len = float(route_length(route, D, closed=False))
-        closed_len = float(open_len + D[route[-1], route[0]])
+        open_len = route_length(route, D, closed=False)
         best_route = route
         best_open_len = open_len
-        best_closed_len = closed_len
         if progress_callback is not None:
             progress_callback({'route': best_route,
                                'length_open': best_open_len,
-                               'length_closed': best_closed_len,
-                               'time': time.time() - t0})
+                               'length_closed': float(best_open_len + D[best_route[-1], best_route[0]]),
+                               'time': time.perf_counter() - t0})
 
         rem_time = None
         if time_limit is not None:
-            rem_time = max(0.0, time_limit - (time.time() - t0))
-        max_iters = int(params.get('max_iters', 1000))
-        # run two_opt (itself may honor time_limit)
-        try:
-            new_route, new_open_len = two_opt(route, D, max_iters=max_iters,
-                                              time_limit=rem_time, progress_callback=progress_callback)
-        except Exception as e:
-            raise RuntimeError(f"two_opt failed: {e}")
-
-        if new_route is not None and len(new_route) > 0:
-            new_closed_len = float(new_open_len + D[new_route[-1], new_route[0]])
-            if new_open_len < best_open_len:
-                best_route = new_route
-                best_open_len = new_open_len
-                best_closed_len = new_closed_len
-        # else keep original
+            rem_time = max(0.0, time_limit - (time.perf_counter() - t0))
+
+        n_starts = int(params.get('n_starts', 1))
+        if n_starts > 1:
+            # multi-start: NN+2-opt from several starts in worker threads
+            # (the njit kernels release the GIL), keep the shortest tour.
+            # Progress callbacks are skipped — there is no single "current"
+            # tour to report while starts run concurrently.
+            rng = np.random.default_rng(params.get('seed'))
+            pool = rng.permutation(n)
+            starts = [start_idx] + [int(s) for s in pool if s != start_idx]
+            starts = starts[:min(n_starts, n)]
+            neighbors = build_neighbor_lists(D)  # shared across threads
+
+            def _one_start(s):
+                r = nearest_neighbor(s, D)
+                nr, ol = two_opt(r, D, max_iters=max_iters,
+                                 time_limit=rem_time, neighbors=neighbors)
+                return nr, ol
+
+            workers = min(len(starts), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(_one_start, starts))
+            for nr, ol in results:
+                if ol < best_open_len:
+                    best_route = nr
+                    best_open_len = ol
+        else:
+            # run two_opt (itself may honor time_limit); the -gpu variant
+            # sweeps on the GPU and falls back to CPU without CuPy
+            opt = two_opt_gpu if method == 'nn+2opt-gpu' else two_opt
+            new_route, new_open_len = opt(route, D, max_iters=max_iters,
+                                          time_limit=rem_time, progress_callback=progress_callback)
+
+            if new_route is not None and len(new_route) > 0:
+                if new_open_len < best_open_len:
+                    best_route = new_route
+                    best_open_len = new_open_len
+            # else keep original
 
     else:
-        raise ValueError(f"Unknown method '{method}' — allowed: 'nn', 'nn+2opt'")
+        raise ValueError(f"Unknown method '{method}' — allowed: 'nn', 'nn+2opt', 'nn+2opt-gpu'")
 
     # prepare distances list (n-1)
-    if best_route is None or len(best_route) == 0:
-        distances = []
+    # consecutive-edge distances as a float32 ndarray; callers that need a
+    # Python list can .tolist() themselves, avoiding n boxed floats here
+    if best_route is None or len(best_route) < 2:
+        distances = np.empty(0, dtype=np.float32)
     else:
-        idx = np.asarray(best_route, dtype=int)
-        if idx.size >= 2:
-            distances = D[idx[:-1], idx[1:]].tolist()
-        else:
-            distances = []
+        idx = best_route  # already int32 ndarray
+        distances = D[idx[:-1], idx[1:]].copy()
+
+    # closed length only matters for the final report: the closing edge is
+    # one D lookup on top of the open length, computed once here rather
+    # than after every NN/2-opt stage
+    if best_route is not None and len(best_route) > 1:
+        best_closed_len = best_open_len + D[best_route[-1], best_route[0]]
+    else:
+        best_closed_len = best_open_len
 
     meta = {
         'method': method,
         'n': n,
-        'time_seconds': time.time() - t0,
+        'time_seconds': time.perf_counter() - t0,
         'best_open_length': float(best_open_len),
         'best_closed_length': float(best_closed_len),
-        'start_idx': int(start_idx)
+        'start_idx': start_idx
     }
 
+    # route stays a typed int32 ndarray end-to-end: the GUI indexes the
+    # points array with it and the exporters np.asarray it anyway
     return {'route': best_route, 'lengths': distances, 'meta': meta}